@@ -13,32 +13,70 @@ Fonctions principales :
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import math
 import os
+import pickle
 import re
+import sys
 import unicodedata
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
+from xml.sax.saxutils import escape
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 from zipfile import ZipFile
 
-import xml.etree.ElementTree as ET
+import numpy as np
+try:
+    from lxml import etree
+except ImportError as exc:  # pragma: no cover
+    raise SystemExit("Le module lxml (installe avec python-docx) est requis. Installez-le avant dexecuter ce script.") from exc
+
+# Dependances lourdes (cartes et Word), importees a la demande par _lazy_imports() :
+# importer ce module pour ses fonctions d'analyse ne les charge pas.
+folium = None
+MacroElement = Template = None
+Document = WD_STYLE_TYPE = parse_xml = nsdecls = qn = None
+
+
+def _lazy_imports() -> None:
+    global folium, MacroElement, Template, Document, WD_STYLE_TYPE, parse_xml, nsdecls, qn
+    if folium is not None and Document is not None:
+        return
+    try:
+        import folium
+        from branca.element import MacroElement
+        from jinja2 import Template
+    except ImportError as exc:  # pragma: no cover - dependance exterieure
+        raise SystemExit("Le module folium est requis. Installez-le avant dexecuter ce script.") from exc
+
+    try:
+        from docx import Document
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import nsdecls, qn
+    except ImportError as exc:  # pragma: no cover
+        raise SystemExit("Le module python-docx est requis. Installez-le avant dexecuter ce script.") from exc
+
 
-from branca.element import MacroElement
-from jinja2 import Template
 try:
-    import folium
-except ImportError as exc:  # pragma: no cover - dependance exterieure
-    raise SystemExit("Le module folium est requis. Installez-le avant dexecuter ce script.") from exc
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - dependance optionnelle
+    HAS_ORJSON = False
 
 try:
-    from docx import Document
-    from docx.enum.style import WD_STYLE_TYPE
-    from docx.oxml.shared import OxmlElement, qn
-except ImportError as exc:  # pragma: no cover
-    raise SystemExit("Le module python-docx est requis. Installez-le avant dexecuter ce script.") from exc
+    import ahocorasick
+
+    HAS_AHOCORASICK = True
+except ImportError:  # pragma: no cover - dependance optionnelle
+    HAS_AHOCORASICK = False
 
 
 # ---------------------------------------------------------------------------
@@ -47,15 +85,37 @@ except ImportError as exc:  # pragma: no cover
 
 DAY_MARKERS = ["\U0001F5D3", "\U0001F5D3\ufe0f"]
 
-@dataclass
+_TIME_PREFIX_RE = re.compile(r"^(\d{1,2}h\d{2}(?:-\d{1,2}h\d{2})?)")
+_TIME_TOKEN_RE = re.compile(r"(\d{1,2})h(\d{2})")
+_TIMELINE_SEP = "\x1f"
+_TIMELINE_RE = re.compile(r"(?:^|(?<=\x1f))(\d{1,2}h\d{2}(?:-\d{1,2}h\d{2})?)[^\x1f]*(?:\x1f([^\x1f]*))?(?:\x1f([^\x1f]*))?")
+_DASH_TRANS = str.maketrans({"–": "-", "—": "-"})
+_RE_NONALNUM = re.compile(r"[^a-z0-9 ]")
+_RE_WS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_text(text: str) -> str:
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    ascii_text = _RE_NONALNUM.sub(" ", ascii_text.lower())
+    return _RE_WS.sub(" ", ascii_text).strip()
+
+
+@dataclass(slots=True, frozen=True)
 class LocationInfo:
     name: str
     lat: float
     lon: float
     category: str
     default_duration: int
-    aliases: Sequence[str] = field(default_factory=list)
+    aliases: Tuple[str, ...] = ()
     notes: str = ""
+    name_lower: str = field(init=False, repr=False, compare=False)
+    norm_name: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name_lower", self.name.lower())
+        object.__setattr__(self, "norm_name", normalize_text(self.name))
 
 
 @dataclass
@@ -75,6 +135,7 @@ class DaySection:
     locations: List[str] = field(default_factory=list)
     removed_duplicates: List[str] = field(default_factory=list)
     added_essentials: List[str] = field(default_factory=list)
+    centroid: Optional[Tuple[float, float]] = None  # cache, remis a None quand `locations` change
 
 
 @dataclass
@@ -101,7 +162,7 @@ def _loc(
     aliases: Sequence[str] = (),
     notes: str = "",
 ) -> LocationInfo:
-    return LocationInfo(name=name, lat=lat, lon=lon, category=category, default_duration=duration, aliases=aliases, notes=notes)
+    return LocationInfo(name=name, lat=lat, lon=lon, category=category, default_duration=duration, aliases=tuple(aliases), notes=notes)
 
 
 LOCATION_LIBRARY: Sequence[LocationInfo] = [
@@ -209,23 +270,74 @@ TRANSIT_OVERRIDES: Dict[Tuple[str, str], int] = {
 # ---------------------------------------------------------------------------
 
 
-def normalize_text(text: str) -> str:
-    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
-    ascii_text = re.sub(r"[^a-z0-9 ]", " ", ascii_text.lower())
-    return re.sub(r"\s+", " ", ascii_text).strip()
-
-
 ALIAS_INDEX: Dict[str, str] = {}
 LOCATION_MAP: Dict[str, LocationInfo] = {}
 for loc in LOCATION_LIBRARY:
     LOCATION_MAP[loc.name] = loc
-    for alias in {loc.name.lower(), *map(str.lower, loc.aliases)}:
+    ALIAS_INDEX[loc.norm_name] = loc.name
+    for alias in loc.aliases:
         ALIAS_INDEX[normalize_text(alias)] = loc.name
 
+HOTEL_INFO = LOCATION_MAP[HOTEL_NAME]
+_LOC_KEYS = frozenset(LOCATION_MAP)
+
+# Les alias sont des mots entiers : une ligne normalisee est decoupee en
+# n-grammes de 1 a _ALIAS_MAX_WORDS mots, chacun recherche dans ALIAS_INDEX.
+_ALIAS_RANK: Dict[str, int] = {alias: rank for rank, alias in enumerate(ALIAS_INDEX) if alias}
+_ALIAS_MAX_WORDS = max(alias.count(" ") + 1 for alias in _ALIAS_RANK)
+
+if HAS_AHOCORASICK:
+    # Automate construit une fois : une seule passe lineaire par ligne.
+    # La valeur porte le rang de l'alias pour conserver l'ordre de ALIAS_INDEX.
+    _ALIAS_AUTOMATON = ahocorasick.Automaton()
+    for alias, rank in _ALIAS_RANK.items():
+        _ALIAS_AUTOMATON.add_word(alias, (rank, len(alias), ALIAS_INDEX[alias]))
+    _ALIAS_AUTOMATON.make_automaton()
+
+# Coordonnees en colonnes (SoA) pour les calculs de distance vectorises.
+_NAME_TO_IDX: Dict[str, int] = {loc.name: i for i, loc in enumerate(LOCATION_LIBRARY)}
+_LAT = np.array([loc.lat for loc in LOCATION_LIBRARY], dtype=np.float64)
+_LON = np.array([loc.lon for loc in LOCATION_LIBRARY], dtype=np.float64)
+_LAT_RAD = np.radians(_LAT)
+_LON_RAD = np.radians(_LON)
+_COORDS = np.column_stack((_LAT, _LON))
+
+
+def haversine_matrix(lat_rad: np.ndarray, lon_rad: np.ndarray) -> np.ndarray:
+    """Matrice des distances (km) entre toutes les paires de points."""
+    dlat = lat_rad[:, None] - lat_rad[None, :]
+    dlon = lon_rad[:, None] - lon_rad[None, :]
+    cos_lat = np.cos(lat_rad)
+    h = np.sin(dlat / 2) ** 2 + cos_lat[:, None] * cos_lat[None, :] * np.sin(dlon / 2) ** 2
+    # Forme atan2 : stable pres de 0 et sans NaN si l'arrondi pousse h au-dela de 1.
+    h = np.clip(h, 0.0, 1.0)
+    return 12742.0 * np.arctan2(np.sqrt(h), np.sqrt(1.0 - h))
+
+
+_PAIR_DIST: np.ndarray = haversine_matrix(_LAT_RAD, _LON_RAD)
+
+# Durees de trajet (minutes) precalculees pour toutes les paires connues.
+WALKING_CATEGORIES = {"walk", "landmark", "shopping", "park"}
+_CAT = np.array([loc.category for loc in LOCATION_LIBRARY])
+_walkable = np.isin(_CAT, list(WALKING_CATEGORIES))
+_speeds = np.where(_walkable[:, None] & _walkable[None, :], 3.8, 5.0)
+_TRAVEL_MIN: np.ndarray = np.maximum(8, (_PAIR_DIST / _speeds * 60).astype(np.int16))
+np.fill_diagonal(_TRAVEL_MIN, 0)
+for (_a, _b), _minutes in TRANSIT_OVERRIDES.items():
+    _TRAVEL_MIN[_NAME_TO_IDX[_a], _NAME_TO_IDX[_b]] = _minutes
+    if (_b, _a) not in TRANSIT_OVERRIDES:
+        _TRAVEL_MIN[_NAME_TO_IDX[_b], _NAME_TO_IDX[_a]] = _minutes
+
 
 EXCLUDED_CATEGORIES = {"museum"}
 UNWANTED_KEYWORDS = ("cathedral", "church", "abbey")
 
+# Filtre constant par lieu : evalue une fois a l'import.
+_FILTER_MASK = np.isin(_CAT, list(EXCLUDED_CATEGORIES)) | np.array(
+    [any(keyword in loc.name_lower for keyword in UNWANTED_KEYWORDS) for loc in LOCATION_LIBRARY]
+)
+_ALLOWED_NAMES = frozenset(LOCATION_LIBRARY[i].name for i in np.flatnonzero(~_FILTER_MASK))
+
 LOCATION_DESCRIPTIONS: Dict[str, str] = {
     "citizenM London Bankside": "Check-in et petite pause pour poser les valises.",
     "South Bank Promenade": "Flane le long de la Tamise, ambiance street art et food stalls.",
@@ -293,58 +405,51 @@ PREFERRED_ORDER: Dict[str, List[str]] = {
 
 
 def clean_location_list(candidates: Sequence[str]) -> List[str]:
-    cleaned: List[str] = []
-    for name in candidates:
-        info = LOCATION_MAP.get(name)
-        if not info:
-            continue
-        if info.category in EXCLUDED_CATEGORIES:
-            continue
-        if any(keyword in name.lower() for keyword in UNWANTED_KEYWORDS):
-            continue
-        cleaned.append(name)
-    return cleaned
+    return [name for name in candidates if name in _ALLOWED_NAMES]
 
 def parse_docx(path: Path) -> List[DaySection]:
     """Analyse le document Word et renvoie la structure journaliere."""
     if not path.exists():
         raise FileNotFoundError(path)
 
-    with ZipFile(path) as doczip:
-        xml = doczip.read("word/document.xml")
-
-    root = ET.fromstring(xml)
-    ns = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
-
-    paragraphs: List[str] = []
-    for p in root.findall(".//w:p", ns):
-        texts = [t.text for t in p.findall(".//w:t", ns) if t.text]
-        if not texts:
-            paragraphs.append("")
-        else:
-            paragraphs.append("".join(texts))
+    w_p = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p"
+    w_t = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t"
 
     days: List[DaySection] = []
     current_title: Optional[str] = None
     buffer: List[str] = []
 
-    for idx, para in enumerate(paragraphs):
-        if any(para.startswith(marker) for marker in DAY_MARKERS):
-            if current_title is not None:
-                day_index = len(days)
-                days.append(
-                    DaySection(
-                        index=day_index,
-                        title=current_title.strip(),
-                        theme=infer_theme(current_title),
-                        lines=[line.strip() for line in buffer if line.strip()],
-                        timeline=extract_timeline(buffer),
+    def iter_paragraphs(xml_file) -> Iterator[str]:
+        # Lecture en flux : seuls les paragraphes de premier niveau sont liberes,
+        # une fois lus avec leurs paragraphes imbriques (zones de texte, formes)
+        # dans l'ordre du document.
+        for _, p in etree.iterparse(xml_file, tag=w_p):
+            if next(p.iterancestors(w_p), None) is not None:
+                continue
+            for q in p.iter(w_p):
+                yield "".join(t.text for t in q.iter(w_t) if t.text)
+            p.clear()
+            while p.getprevious() is not None:
+                del p.getparent()[0]
+
+    with ZipFile(path) as doczip, doczip.open("word/document.xml") as xml_file:
+        for para in iter_paragraphs(xml_file):
+            if any(para.startswith(marker) for marker in DAY_MARKERS):
+                if current_title is not None:
+                    day_index = len(days)
+                    days.append(
+                        DaySection(
+                            index=day_index,
+                            title=current_title.strip(),
+                            theme=infer_theme(current_title),
+                            lines=[line.strip() for line in buffer if line.strip()],
+                            timeline=extract_timeline(buffer),
+                        )
                     )
-                )
-            current_title = para.strip()
-            buffer = []
-        elif current_title is not None:
-            buffer.append(para)
+                current_title = para.strip()
+                buffer = []
+            elif current_title is not None:
+                buffer.append(para)
 
     if current_title is not None:
         day_index = len(days)
@@ -363,12 +468,23 @@ def parse_docx(path: Path) -> List[DaySection]:
 
 def extract_timeline(lines: Iterable[str]) -> List[TimelineItem]:
     """Recherche des blocs (heure, activite, details) dans le tableau existant."""
+    clean_lines = [line.strip().translate(_DASH_TRANS) for line in lines if line.strip()]
+    if any(_TIMELINE_SEP in line for line in clean_lines):
+        return _walk_timeline(clean_lines)
+    # Une ligne horaire suivie de ses deux lignes (activite, details), en une passe regex.
+    return [
+        TimelineItem(time=match.group(1), activity=match.group(2) or "", details=match.group(3) or "")
+        for match in _TIMELINE_RE.finditer(_TIMELINE_SEP.join(clean_lines))
+    ]
+
+
+def _walk_timeline(clean_lines: Sequence[str]) -> List[TimelineItem]:
+    """Parcours ligne a ligne, pour les textes contenant deja le separateur."""
     items: List[TimelineItem] = []
-    clean_lines = [line.strip().replace("–", "-").replace("—", "-") for line in lines if line.strip()]
     i = 0
     while i < len(clean_lines):
         current = clean_lines[i]
-        match = re.match(r"^(\d{1,2}h\d{2}(?:-\d{1,2}h\d{2})?)", current)
+        match = _TIME_PREFIX_RE.match(current)
         if match:
             time = match.group(1)
             activity = clean_lines[i + 1] if i + 1 < len(clean_lines) else ""
@@ -380,55 +496,107 @@ def extract_timeline(lines: Iterable[str]) -> List[TimelineItem]:
     return items
 
 
+# Mots du titre -> thematique ; la priorite suit l'ordre de THEME_PRIORITY.
+_THEME_TOKENS: Dict[str, str] = {
+    "dernier": "departure",
+    "derniers": "departure",
+    "derniere": "departure",
+    "dernieres": "departure",
+    "mercredi": "departure",
+    "panorama": "city",
+    "panoramas": "city",
+    "trafalgar": "city",
+    "mardi": "city",
+    "mayfair": "mayfair",
+    "hyde": "mayfair",
+    "lundi": "mayfair",
+}
+THEME_PRIORITY = ("departure", "city", "mayfair")
+
+
 def infer_theme(title: str) -> str:
     norm = normalize_text(title)
-    if "depart" in norm or "dernier" in norm or "mercredi" in norm:
+    # "depart" reste un test de sous-chaine : il couvre depart, departs, departure...
+    if "depart" in norm:
         return "departure"
-    if "panorama" in norm or "trafalgar" in norm or "mardi" in norm:
-        return "city"
-    if "mayfair" in norm or "hyde" in norm or "lundi" in norm:
-        return "mayfair"
+    themes = {_THEME_TOKENS.get(token) for token in norm.split()}
+    for theme in THEME_PRIORITY:
+        if theme in themes:
+            return theme
     return "arrival"
 
 
+def _match_aliases(norm_line: str) -> List[str]:
+    """Lieux dont un alias apparait comme mot(s) entier(s), dans l'ordre de ALIAS_INDEX."""
+    hits: Set[Tuple[int, str]] = set()
+    if HAS_AHOCORASICK:
+        last = len(norm_line) - 1
+        for end, (rank, length, name) in _ALIAS_AUTOMATON.iter(norm_line):
+            start = end - length + 1
+            if (start == 0 or norm_line[start - 1] == " ") and (end == last or norm_line[end + 1] == " "):
+                hits.add((rank, name))
+    else:
+        tokens = norm_line.split()
+        for i in range(len(tokens)):
+            for n in range(1, min(_ALIAS_MAX_WORDS, len(tokens) - i) + 1):
+                candidate = " ".join(tokens[i : i + n])
+                rank = _ALIAS_RANK.get(candidate)
+                if rank is not None:
+                    hits.add((rank, ALIAS_INDEX[candidate]))
+    return [name for _, name in sorted(hits)]
+
+
 def find_locations_in_text(lines: Iterable[str]) -> List[str]:
     found: List[str] = []
+    seen: Set[str] = set()
     for line in lines:
-        norm_line = normalize_text(line)
-        for alias, name in ALIAS_INDEX.items():
-            if alias and alias in norm_line and name not in found:
+        for name in _match_aliases(normalize_text(line)):
+            if name not in seen:
+                seen.add(name)
                 found.append(name)
     return found
 
 
+# Valeurs par defaut selon la thematique, si la journee n'a pas d'horaires
+DAY_TIME_PRESETS: Dict[str, Tuple[int, int]] = {
+    "arrival": (15 * 60, 23 * 60),
+    "mayfair": (9 * 60 + 30, 22 * 60),
+    "city": (9 * 60, 21 * 60 + 30),
+    "departure": (7 * 60, 12 * 60),
+}
+
+
+def get_days_time_bounds(days: Sequence[DaySection]) -> Dict[int, Tuple[int, int]]:
+    """Retourne {day.index: (start_min, end_min)} pour toutes les journees."""
+    bounds: Dict[int, Tuple[int, int]] = {}
+    counts = np.array([len(day.timeline) for day in days], dtype=np.intp)
+    ranges = [parse_time_range(item.time) for day in days for item in day.timeline]
+    if ranges:
+        # Un min/max par journee non vide, en une seule reduction sur le tableau a plat.
+        times = np.array(ranges, dtype=np.int64)
+        offsets = (np.cumsum(counts) - counts)[counts > 0]
+        starts = np.minimum.reduceat(times[:, 0], offsets).tolist()
+        ends = np.maximum.reduceat(times[:, 1], offsets).tolist()
+        timed_days = [day for day, count in zip(days, counts) if count]
+        for day, start, end in zip(timed_days, starts, ends):
+            if day.theme == "city" and end < 22 * 60 + 30:
+                end = 22 * 60 + 30
+            bounds[day.index] = (start, min(end, 23 * 60 + 30))
+    for day in days:
+        if day.index not in bounds:
+            bounds[day.index] = DAY_TIME_PRESETS.get(day.theme, (9 * 60, 21 * 60))
+    return bounds
+
+
 def get_day_time_bounds(day: DaySection) -> Tuple[int, int]:
     """Retourne (start_min, end_min)."""
-    start = math.inf
-    end = -math.inf
-    for item in day.timeline:
-        start_min, end_min = parse_time_range(item.time)
-        start = min(start, start_min)
-        end = max(end, end_min)
-    if start is math.inf:
-        # Valeurs par defaut selon la thematique
-        presets = {
-            "arrival": (15 * 60, 23 * 60),
-            "mayfair": (9 * 60 + 30, 22 * 60),
-            "city": (9 * 60, 21 * 60 + 30),
-            "departure": (7 * 60, 12 * 60),
-        }
-        return presets.get(day.theme, (9 * 60, 21 * 60))
-    start = int(start)
-    end = int(end)
-    if day.theme == "city" and end < 22 * 60 + 30:
-        end = 22 * 60 + 30
-    return start, min(end, 23 * 60 + 30)
+    return get_days_time_bounds([day])[day.index]
 
 
 def parse_time_range(time_str: str) -> Tuple[int, int]:
     """Convertit une chaine 'HHhMM-HHhMM' en minutes absolues."""
-    normalized = time_str.replace("–", "-").replace("—", "-")
-    matches = re.findall(r"(\d{1,2})h(\d{2})", normalized)
+    normalized = time_str.translate(_DASH_TRANS)
+    matches = _TIME_TOKEN_RE.findall(normalized)
     if not matches:
         raise ValueError(f"Format dheure inattendu: {time_str}")
 
@@ -461,7 +629,11 @@ def merge_duplicate_locations(days: List[DaySection]) -> None:
         for name in day.locations:
             index_by_loc.setdefault(name, []).append(day.index)
 
-    centroids = {day.index: compute_centroid(day.locations or [HOTEL_NAME]) for day in days}
+    centroid_lat, centroid_lon = compute_day_centroids(days)
+    for day in days:
+        day.centroid = (float(centroid_lat[day.index]), float(centroid_lon[day.index]))
+    centroid_lat_rad = np.radians(centroid_lat)
+    centroid_lon_rad = np.radians(centroid_lon)
 
     for name, indices in index_by_loc.items():
         if len(indices) <= 1:
@@ -469,7 +641,13 @@ def merge_duplicate_locations(days: List[DaySection]) -> None:
         loc_info = LOCATION_MAP.get(name)
         if name not in DEDUP_WHITELIST and (not loc_info or loc_info.category not in {"transport", "hotel"}):
             continue
-        best_index = min(indices, key=lambda idx: distance_between(name, centroids[idx]))
+        i = _NAME_TO_IDX.get(name)
+        if i is None:
+            best_index = indices[0]
+        else:
+            day_idx = np.array(indices, dtype=np.intp)
+            distances = haversine_rad(_LAT_RAD[i], _LON_RAD[i], centroid_lat_rad[day_idx], centroid_lon_rad[day_idx])
+            best_index = indices[int(distances.argmin())]
         for idx in indices:
             if idx == best_index:
                 continue
@@ -479,6 +657,7 @@ def merge_duplicate_locations(days: List[DaySection]) -> None:
             if name in day.locations:
                 day.locations.remove(name)
                 day.removed_duplicates.append(name)
+                day.centroid = None
 
 
 def compute_centroid(location_names: Sequence[str]) -> Tuple[float, float]:
@@ -498,43 +677,60 @@ def compute_centroid(location_names: Sequence[str]) -> Tuple[float, float]:
     return lat_sum / count, lon_sum / count
 
 
-def distance_between(location_name: str, point: Tuple[float, float]) -> float:
-    loc = LOCATION_MAP.get(location_name)
-    if not loc:
-        return float("inf")
-    return haversine_km((loc.lat, loc.lon), point)
+def compute_centroid_for_day(day: DaySection) -> Tuple[float, float]:
+    """Centroide de la journee, recalcule seulement si `day.centroid` a ete invalide."""
+    if day.centroid is None:
+        day.centroid = compute_centroid(day.locations or [HOTEL_NAME])
+    return day.centroid
+
 
+def compute_day_centroids(days: Sequence[DaySection]) -> Tuple[np.ndarray, np.ndarray]:
+    """Centroides (lat, lon en degres) de toutes les journees en un seul passage."""
+    if not days:
+        return np.empty(0), np.empty(0)
+    hotel_idx = _NAME_TO_IDX[HOTEL_NAME]
+    groups = [[_NAME_TO_IDX[name] for name in day.locations if name in _NAME_TO_IDX] or [hotel_idx] for day in days]
+    counts = np.array([len(group) for group in groups])
+    indices = np.fromiter((i for group in groups for i in group), dtype=np.intp, count=int(counts.sum()))
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return np.add.reduceat(_LAT[indices], offsets) / counts, np.add.reduceat(_LON[indices], offsets) / counts
 
-def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-    lat1, lon1 = map(math.radians, a)
-    lat2, lon2 = map(math.radians, b)
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-    return 6371.0 * (2 * math.asin(math.sqrt(h)))
+
+def haversine_rad(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distance (km) entre points en radians ; scalaires ou tableaux (broadcasting)."""
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    h = np.clip(h, 0.0, 1.0)
+    return 12742.0 * np.arctan2(np.sqrt(h), np.sqrt(1.0 - h))
+
+
+def distances_to_point(idxs: np.ndarray, point: Tuple[float, float]) -> np.ndarray:
+    """Distances (km) entre les lieux d'indices `idxs` et un point (lat, lon) en degres."""
+    lat, lon = map(math.radians, point)
+    return haversine_rad(_LAT_RAD[idxs], _LON_RAD[idxs], lat, lon)
 
 
 def add_missing_essentials(days: List[DaySection]) -> None:
     used = {loc for day in days for loc in day.locations}
     for day in days:
         essentials = ESSENTIALS_BY_THEME.get(day.theme, [])
-        centroid = compute_centroid(day.locations or [HOTEL_NAME])
+        centroid = compute_centroid_for_day(day)
         for essential in essentials:
-            if essential in used:
-                continue
-            info = LOCATION_MAP.get(essential)
-            if not info:
-                continue
-            if info.category in EXCLUDED_CATEGORIES:
-                continue
-            if any(keyword in essential.lower() for keyword in UNWANTED_KEYWORDS):
+            if essential in used or essential not in _ALLOWED_NAMES:
                 continue
             used.add(essential)
             day.locations.append(essential)
             day.added_essentials.append(essential)
         # Nettoyage puis tri par distance pour une sequence coherente
-        unique_locations = list(dict.fromkeys(clean_location_list(day.locations)))
-        day.locations = sorted(unique_locations, key=lambda name: distance_between(name, centroid))
+        unique_locations: List[str] = []
+        seen: Set[str] = set()
+        for name in clean_location_list(day.locations):
+            if name not in seen:
+                seen.add(name)
+                unique_locations.append(name)
+        idxs = np.fromiter((_NAME_TO_IDX[name] for name in unique_locations), dtype=np.intp, count=len(unique_locations))
+        order = np.argsort(distances_to_point(idxs, centroid), kind="stable")
+        day.locations = [unique_locations[i] for i in order]
+        day.centroid = None
 
 
 def order_locations(start: str, visits: Sequence[str], end: str) -> List[str]:
@@ -554,37 +750,29 @@ def order_locations(start: str, visits: Sequence[str], end: str) -> List[str]:
 def distance_between_pair(a_name: str, b_name: str) -> float:
     if a_name == b_name:
         return 0.0
-    a = LOCATION_MAP.get(a_name)
-    b = LOCATION_MAP.get(b_name)
-    if not a or not b:
+    i = _NAME_TO_IDX.get(a_name)
+    j = _NAME_TO_IDX.get(b_name)
+    if i is None or j is None:
         return 999.0
-    return haversine_km((a.lat, a.lon), (b.lat, b.lon))
+    return float(_PAIR_DIST[i, j])
 
 
 def estimate_travel_minutes(a_name: str, b_name: str) -> int:
     if a_name == b_name:
         return 0
-    if (a_name, b_name) in TRANSIT_OVERRIDES:
-        return TRANSIT_OVERRIDES[(a_name, b_name)]
-    if (b_name, a_name) in TRANSIT_OVERRIDES:
-        return TRANSIT_OVERRIDES[(b_name, a_name)]
-
-    distance = distance_between_pair(a_name, b_name)
-    loc_a = LOCATION_MAP.get(a_name)
-    loc_b = LOCATION_MAP.get(b_name)
-
-    if not loc_a or not loc_b:
-        return int(distance / 4.5 * 60) + 5
-
-    base_speed_kmh = 3.8 if all(cat in {"walk", "landmark", "shopping", "park"} for cat in (loc_a.category, loc_b.category)) else 5.0
-    minutes = int((distance / max(base_speed_kmh, 0.1)) * 60)
-    return max(minutes, 8)
-
-
-def describe_location(name: str) -> str:
-    if name in LOCATION_DESCRIPTIONS:
-        return LOCATION_DESCRIPTIONS[name]
-    info = LOCATION_MAP.get(name)
+    i = _NAME_TO_IDX.get(a_name)
+    j = _NAME_TO_IDX.get(b_name)
+    if i is not None and j is not None:
+        return int(_TRAVEL_MIN[i, j])
+    return int(distance_between_pair(a_name, b_name) / 4.5 * 60) + 5
+
+
+def describe_location(name: str, info: Optional[LocationInfo] = None) -> str:
+    description = LOCATION_DESCRIPTIONS.get(name)
+    if description is not None:
+        return description
+    if info is None:
+        info = LOCATION_MAP.get(name)
     if not info:
         return ""
     if info.category == "food":
@@ -596,23 +784,43 @@ def describe_location(name: str) -> str:
     return info.category.capitalize()
 
 
-def friendly_transfer_detail(start: str, end: str, duration: int) -> str:
+TRANSFER_DURATION_TEXTS = (
+    "Petite marche ou trajet rapide (<= 15 min).",
+    "Deplacement fluide (~30 min), prends ton temps.",
+    "Prevoir ce trajet sans stress, musique ou podcast en route.",
+)
+
+
+@lru_cache(maxsize=512)
+def _transfer_detail(start: str, end: str, duration_bucket: int) -> str:
     note = TRANSFER_NOTES.get((start, end)) or TRANSFER_NOTES.get((end, start))
     if note:
         return note
+    return TRANSFER_DURATION_TEXTS[duration_bucket]
+
+
+def friendly_transfer_detail(start: str, end: str, duration: int) -> str:
     if duration <= 15:
-        return "Petite marche ou trajet rapide (<= 15 min)."
+        return _transfer_detail(start, end, 0)
     if duration <= 30:
-        return "Deplacement fluide (~30 min), prends ton temps."
-    return "Prevoir ce trajet sans stress, musique ou podcast en route."
+        return _transfer_detail(start, end, 1)
+    return _transfer_detail(start, end, 2)
+
 
+@lru_cache(maxsize=512)
+def route_label(start: str, end: str) -> str:
+    return f"{start} -> {end}"
 
-def build_day_schedule(day: DaySection) -> List[Segment]:
-    start_time, end_time = get_day_time_bounds(day)
+
+def build_day_schedule(day: DaySection, time_bounds: Optional[Tuple[int, int]] = None) -> List[Segment]:
+    start_time, end_time = time_bounds or get_day_time_bounds(day)
     current_time = start_time
 
     segments: List[Segment] = []
 
+    # Resolution unique nom -> LocationInfo pour toute la journee ; `infos` sert
+    # aussi d'ensemble pour les tests d'appartenance (poi_locations garde l'ordre).
+    infos: Dict[str, LocationInfo] = {}
     poi_locations: List[str] = []
     for loc in day.locations:
         info = LOCATION_MAP.get(loc)
@@ -620,10 +828,13 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
             continue
         if info.category in {"transport", "hotel"}:
             continue
-        poi_locations.append(loc)
+        if loc not in infos:
+            infos[loc] = info
+            poi_locations.append(loc)
 
-    if "Oblix at The Shard" in poi_locations and "The Shard" in poi_locations:
-        poi_locations = [loc for loc in poi_locations if loc != "The Shard"]
+    if "Oblix at The Shard" in infos and "The Shard" in infos:
+        del infos["The Shard"]
+        poi_locations.remove("The Shard")
 
     previous = HOTEL_NAME
 
@@ -654,15 +865,14 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
         )
         current_time += travel_duration
 
-        hotel_info = LOCATION_MAP[HOTEL_NAME]
-        checkin_duration = max(45, hotel_info.default_duration)
+        checkin_duration = max(45, HOTEL_INFO.default_duration)
         segments.append(
             Segment(
                 start=current_time,
                 end=current_time + checkin_duration,
                 title="Installation a l'hotel",
                 location=HOTEL_NAME,
-                details=describe_location(HOTEL_NAME),
+                details=describe_location(HOTEL_NAME, HOTEL_INFO),
                 segment_type="visit",
             )
         )
@@ -673,21 +883,18 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
         previous = HOTEL_NAME
 
     visits_order: List[str] = []
+    visits_set: Set[str] = set()
     preferred = PREFERRED_ORDER.get(day.theme, [])
-    for name in preferred:
-        if name in poi_locations and name not in visits_order:
-            visits_order.append(name)
-    for name in poi_locations:
-        if name not in visits_order:
+    for name in [*preferred, *poi_locations]:
+        if name in infos and name not in visits_set:
+            visits_set.add(name)
             visits_order.append(name)
-    if day.theme == "city" and "Oblix at The Shard" not in visits_order:
+    if day.theme == "city" and "Oblix at The Shard" not in visits_set:
         visits_order.append("Oblix at The Shard")
+        infos["Oblix at The Shard"] = LOCATION_MAP["Oblix at The Shard"]
 
     for next_loc in visits_order:
-        loc_info = LOCATION_MAP.get(next_loc)
-        if not loc_info:
-            continue
-
+        loc_info = infos[next_loc]
         travel_duration = estimate_travel_minutes(previous, next_loc)
         if current_time + travel_duration > end_time:
             break
@@ -697,7 +904,7 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
                     start=current_time,
                     end=current_time + travel_duration,
                     title=f"Trajet vers {next_loc}",
-                    location=f"{previous} -> {next_loc}",
+                    location=route_label(previous, next_loc),
                     details=friendly_transfer_detail(previous, next_loc, travel_duration),
                     segment_type="transfer",
                 )
@@ -721,7 +928,7 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
                 end=current_time + visit_duration,
                 title=next_loc,
                 location=next_loc,
-                details=describe_location(next_loc),
+                details=describe_location(next_loc, loc_info),
                 segment_type="meal" if loc_info.category == "food" else "visit",
             )
         )
@@ -735,7 +942,7 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
                 start=current_time,
                 end=current_time + travel_duration,
                 title="Retour a l'hotel",
-                location=f"{previous} -> {HOTEL_NAME}",
+                location=route_label(previous, HOTEL_NAME),
                 details=friendly_transfer_detail(previous, HOTEL_NAME, travel_duration),
                 segment_type="transfer",
             )
@@ -761,7 +968,7 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
                     start=current_time,
                     end=current_time + travel_duration,
                     title="Retour a l'hotel",
-                    location=f"{previous} -> {HOTEL_NAME}",
+                    location=route_label(previous, HOTEL_NAME),
                     details=friendly_transfer_detail(previous, HOTEL_NAME, travel_duration),
                     segment_type="transfer",
                 )
@@ -774,7 +981,7 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
                 start=current_time,
                 end=current_time + transfer,
                 title="Transfert vers Heathrow",
-                location=f"{HOTEL_NAME} -> Heathrow Airport",
+                location=route_label(HOTEL_NAME, "Heathrow Airport"),
                 details=friendly_transfer_detail(HOTEL_NAME, "Heathrow Airport", transfer),
                 segment_type="transfer",
             )
@@ -794,14 +1001,20 @@ def build_day_schedule(day: DaySection) -> List[Segment]:
     return segments
 
 
+# Libelles "HHhMM" precalcules pour chaque minute de 00h00 a 24h00.
+_MIN_LABELS: Tuple[str, ...] = tuple(f"{m // 60:02d}h{m % 60:02d}" for m in range(24 * 60 + 1))
+
+
 def minutes_to_label(minutes: int) -> str:
+    if 0 <= minutes < len(_MIN_LABELS):
+        return _MIN_LABELS[minutes]
     hour = minutes // 60
     minute = minutes % 60
     return f"{hour:02d}h{minute:02d}"
 
 
 def make_time_range(start: int, end: int) -> str:
-    return f"{minutes_to_label(start)}-{minutes_to_label(end)}"
+    return minutes_to_label(start) + "-" + minutes_to_label(end)
 
 
 def ensure_directory(path: Path) -> Path:
@@ -809,34 +1022,96 @@ def ensure_directory(path: Path) -> Path:
     return path
 
 
+LEGEND_HTML = """
+<div style="
+    position: fixed;
+    bottom: 20px;
+    left: 20px;
+    z-index: 9999;
+    background-color: white;
+    padding: 10px 14px;
+    border: 1px solid #ccc;
+    box-shadow: 0 0 6px rgba(0,0,0,0.2);
+    font-size: 12px;
+    line-height: 1.4;
+">
+    <b>Legende</b><br>
+    <span style="color:#d9534f">&#9679;</span> Depart<br>
+    <span style="color:#337ab7">&#9679;</span> Balade / visite<br>
+    <span style="color:#5cb85c">&#9679;</span> Pause gourmande<br>
+    <span style="color:#6f42c1">&#9679;</span> Retour hotel / aeroport<br>
+    <span style="color:#FF6F61">&#8213;</span> Trajet conseille
+</div>
+"""
+
+@lru_cache(maxsize=None)
+def get_legend() -> MacroElement:
+    """Element statique : construit une fois et partage par toutes les cartes."""
+    _lazy_imports()
+    legend = MacroElement()
+    legend._template = Template("{% macro html(this, kwargs) %}" + LEGEND_HTML + "{% endmacro %}")
+    return legend
+
+
+_VISIT_TYPES = frozenset({"visit", "meal"})
+
+_ICON_CACHE: Dict[Tuple[str, str], folium.Icon] = {}
+
+
+def get_icon(color: str, icon: str) -> folium.Icon:
+    """Icone partagee entre tous les marqueurs de meme style."""
+    key = (color, icon)
+    cached = _ICON_CACHE.get(key)
+    if cached is None:
+        _lazy_imports()
+        cached = _ICON_CACHE[key] = folium.Icon(color=color, icon=icon)
+    return cached
+
+
 def create_daily_map(day: DaySection, segments: List[Segment], output_dir: Path) -> Path:
+    _lazy_imports()
     start_name = "Heathrow Airport" if day.theme == "arrival" else HOTEL_NAME
     end_name = "Heathrow Airport" if day.theme == "departure" else HOTEL_NAME
 
     start_info = LOCATION_MAP.get(start_name)
     end_info = LOCATION_MAP.get(end_name)
 
-    visits = [s for s in segments if s.segment_type in {"visit", "meal"} and s.location in LOCATION_MAP]
+    visits = [s for s in segments if s.segment_type in _VISIT_TYPES and s.location in _LOC_KEYS]
     if not start_info or (not visits and not end_info):
         return output_dir / f"day_{day.index + 1}_no_map.html"
 
+    # Une seule passe : `last` suit le dernier lieu ajoute a la sequence.
     route_sequence: List[str] = []
+    seen: Set[str] = set()
+    last: Optional[str] = None
     if start_info:
+        seen.add(start_name)
         route_sequence.append(start_name)
+        last = start_name
     for seg in visits:
-        if seg.location not in route_sequence:
+        if seg.location not in seen:
+            seen.add(seg.location)
             route_sequence.append(seg.location)
-    if end_info and (not route_sequence or route_sequence[-1] != end_name):
+            last = seg.location
+    if end_info and last != end_name:
         route_sequence.append(end_name)
 
-    coords = [(LOCATION_MAP[name].lat, LOCATION_MAP[name].lon) for name in route_sequence if name in LOCATION_MAP]
-    if not coords:
+    idxs = [_NAME_TO_IDX[name] for name in route_sequence if name in _NAME_TO_IDX]
+    if not idxs:
         return output_dir / f"day_{day.index + 1}_no_map.html"
 
-    avg_lat = sum(lat for lat, _ in coords) / len(coords)
-    avg_lon = sum(lon for _, lon in coords) / len(coords)
-
-    fmap = folium.Map(location=[avg_lat, avg_lon], zoom_start=14)
+    avg_lat, avg_lon = _COORDS[idxs].mean(axis=0).tolist()
+
+    # Rendu canvas : les visites sont dessinees dans un seul <canvas> au lieu d'une image par marqueur.
+    # Pas de boutons de zoom ni d'echelle (le zoom molette/tactile reste actif).
+    fmap = folium.Map(
+        location=[avg_lat, avg_lon],
+        zoom_start=14,
+        tiles="OpenStreetMap",
+        prefer_canvas=True,
+        control_scale=False,
+        zoom_control=False,
+    )
 
     # Start marker
     if start_info:
@@ -844,68 +1119,57 @@ def create_daily_map(day: DaySection, segments: List[Segment], output_dir: Path)
             location=[start_info.lat, start_info.lon],
             tooltip=f"Depart : {start_name}",
             popup=f"0. Depart - {start_name}",
-            icon=folium.Icon(color="red", icon="home"),
+            icon=get_icon("red", "home"),
         ).add_to(fmap)
 
     route_points = [[start_info.lat, start_info.lon]] if start_info else []
 
+    visit_layer = folium.FeatureGroup(name="Visites")
+    visit_markers: List[folium.CircleMarker] = []
     for idx, seg in enumerate(visits, start=1):
         loc = LOCATION_MAP.get(seg.location)
         if not loc:
             continue
-        popup = f"{idx}. {seg.title} ({minutes_to_label(seg.start)} - {minutes_to_label(seg.end)})"
-        details = seg.details or ""
-        if details:
-            popup = f"{popup}<br>{details}"
-        folium.Marker(
+        popup = f"{idx}. {seg.title} ({minutes_to_label(seg.start)} - {minutes_to_label(seg.end)})" + (
+            f"<br>{seg.details}" if seg.details else ""
+        )
+        color = "#5cb85c" if seg.segment_type == "meal" else "#337ab7"
+        marker = folium.CircleMarker(
             location=[loc.lat, loc.lon],
+            radius=6,
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.9,
             tooltip=seg.title,
             popup=popup,
-            icon=folium.Icon(color="green" if seg.segment_type == "meal" else "blue", icon="info-sign"),
-        ).add_to(fmap)
+        )
+        marker._parent = visit_layer
+        visit_markers.append(marker)
         route_points.append([loc.lat, loc.lon])
+    # Equivalent a add_child() pour chaque marqueur, en une seule mise a jour.
+    visit_layer._children.update((marker.get_name(), marker) for marker in visit_markers)
+    visit_layer.add_to(fmap)
 
     if end_info:
         folium.Marker(
             location=[end_info.lat, end_info.lon],
             tooltip=f"Retour : {end_name}",
             popup=f"Fin - {end_name}",
-            icon=folium.Icon(color="purple", icon="flag"),
+            icon=get_icon("purple", "flag"),
         ).add_to(fmap)
         route_points.append([end_info.lat, end_info.lon])
 
     if len(route_points) >= 2:
         folium.PolyLine(route_points, color="#FF6F61", weight=4, opacity=0.8, tooltip="Parcours du jour").add_to(fmap)
 
-    legend_html = """
-    <div style="
-        position: fixed;
-        bottom: 20px;
-        left: 20px;
-        z-index: 9999;
-        background-color: white;
-        padding: 10px 14px;
-        border: 1px solid #ccc;
-        box-shadow: 0 0 6px rgba(0,0,0,0.2);
-        font-size: 12px;
-        line-height: 1.4;
-    ">
-        <b>Legende</b><br>
-        <span style="color:#d9534f">&#9679;</span> Depart<br>
-        <span style="color:#337ab7">&#9679;</span> Balade / visite<br>
-        <span style="color:#5cb85c">&#9679;</span> Pause gourmande<br>
-        <span style="color:#6f42c1">&#9679;</span> Retour hotel / aeroport<br>
-        <span style="color:#FF6F61">&#8213;</span> Trajet conseille
-    </div>
-    """
-    legend = MacroElement()
-    legend._template = Template(
-        "{% macro html(this, kwargs) %}" + legend_html + "{% endmacro %}"
-    )
-    fmap.get_root().add_child(legend)
+    fmap.get_root().add_child(get_legend())
 
     map_path = output_dir / f"day_{day.index + 1}_{slugify(day.title)}.html"
-    fmap.save(str(map_path))
+    # Rendu en memoire puis une seule ecriture via un tampon de 1 Mio.
+    html = fmap.get_root().render()
+    with open(map_path, "w", encoding="utf-8", buffering=1024 * 1024) as fh:
+        fh.write(html)
     return map_path
 
 
@@ -915,7 +1179,7 @@ def slugify(text: str) -> str:
 
 
 def to_windows_uri(path: Path) -> str:
-    resolved = path.resolve()
+    resolved = path if path.is_absolute() else path.resolve()
     raw = str(resolved)
     if raw.startswith("/mnt/") and len(raw) > 6:
         drive_letter = raw[5].upper()
@@ -926,33 +1190,22 @@ def to_windows_uri(path: Path) -> str:
 
 def add_hyperlink(paragraph, text: str, url_path: Path) -> None:
     """Ajoute un lien cliquable dans un paragraphe python-docx."""
+    _lazy_imports()
     href = to_windows_uri(url_path)
     part = paragraph.part
     r_id = part.relate_to(href, reltype="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink", is_external=True)
 
-    hyperlink = OxmlElement("w:hyperlink")
-    hyperlink.set(qn("r:id"), r_id)
-
-    new_run = OxmlElement("w:r")
-    rPr = OxmlElement("w:rPr")
-
-    u = OxmlElement("w:u")
-    u.set(qn("w:val"), "single")
-    rPr.append(u)
-
-    color = OxmlElement("w:color")
-    color.set(qn("w:val"), "0000FF")
-    rPr.append(color)
-
-    new_run.append(rPr)
-    text_elem = OxmlElement("w:t")
-    text_elem.text = text
-    new_run.append(text_elem)
-    hyperlink.append(new_run)
+    hyperlink = parse_xml(
+        f'<w:hyperlink {nsdecls("w", "r")} r:id="{r_id}">'
+        '<w:r><w:rPr><w:u w:val="single"/><w:color w:val="0000FF"/></w:rPr>'
+        f'<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+        "</w:hyperlink>"
+    )
     paragraph._p.append(hyperlink)
 
 
 def build_document(output_path: Path, days: List[DaySection], day_segments: Dict[int, List[Segment]], map_paths: Dict[int, Path]) -> None:
+    _lazy_imports()
     doc = Document()
     styles = doc.styles
     if "Itinerary Heading" not in styles:
@@ -990,77 +1243,170 @@ def build_document(output_path: Path, days: List[DaySection], day_segments: Dict
         hdr[1].text = "Moment"
         hdr[2].text = "Ambiance"
 
-        for seg in segments:
-            row = table.add_row().cells
-            row[0].text = make_time_range(seg.start, seg.end)
-            row[1].text = seg.title
-            row[2].text = seg.details
+        if segments:
+            # Une ligne modele (3 cellules avec un <w:t> chacune) clonee par segment,
+            # plutot qu'un add_row() + 3 affectations .text par ligne.
+            template_row = table.add_row()
+            for cell in template_row.cells:
+                cell.paragraphs[0].add_run(" ")
+            template_tr = template_row._tr
+            table._tbl.remove(template_tr)
+            for seg in segments:
+                tr = deepcopy(template_tr)
+                for text_elem, value in zip(tr.iter(qn("w:t")), (make_time_range(seg.start, seg.end), seg.title, seg.details)):
+                    text_elem.text = value
+                table._tbl.append(tr)
 
         doc.add_paragraph("")
         map_path = map_paths.get(day.index)
         if map_path and map_path.exists():
             para = doc.add_paragraph("Carte interactive : ")
-            add_hyperlink(para, map_path.name, map_path.resolve())
+            add_hyperlink(para, map_path.name, map_path)
         doc.add_paragraph("")  # espace
 
     doc.save(output_path)
 
 
+def encode_summary(summary: Dict[str, object]) -> bytes:
+    """JSON UTF-8 indente ; orjson si disponible, sinon le module standard."""
+    if HAS_ORJSON:
+        return orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def map_input_hash(day: DaySection, segments: Sequence[Segment]) -> str:
+    """Empreinte des entrees d'une carte (et de ce script) pour eviter un rendu inutile."""
+    payload = repr(
+        (
+            Path(__file__).stat().st_mtime_ns,
+            day.index,
+            day.title,
+            day.theme,
+            [(seg.start, seg.end, seg.title, seg.location, seg.details, seg.segment_type) for seg in segments],
+        )
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_map_hashes(path: Path) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_days(input_path: Path, cache_path: Path) -> List[DaySection]:
+    """Analyse le document et place les lieux ; resultat mis en cache tant que le .docx (et ce script) ne changent pas."""
+    input_stat = input_path.stat()
+    key = (input_stat.st_mtime_ns, input_stat.st_size, Path(__file__).stat().st_mtime_ns)
+    if cache_path.exists():
+        try:
+            with open(cache_path, "rb") as fh:
+                cached_key, cached_days = pickle.load(fh)
+            if cached_key == key:
+                return cached_days
+        except (OSError, EOFError, ValueError, AttributeError, pickle.UnpicklingError):
+            pass  # cache illisible : on le regenere
+
+    days = parse_docx(input_path)
+    for day in days:
+        located = find_locations_in_text([day.title, *day.lines])
+        day.locations = clean_location_list(located)
+
+    merge_duplicate_locations(days)
+    add_missing_essentials(days)
+
+    with open(cache_path, "wb") as fh:
+        pickle.dump((key, days), fh, protocol=pickle.HIGHEST_PROTOCOL)
+    return days
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Optimise l'itineraire et genere cartes/Word.")
     parser.add_argument("--output-dir", default="optimized_london", help="Repertoire de sortie (defaut: optimized_london).")
     parser.add_argument("--skip-document", action="store_true", help="Ne pas regenerer le document Word (utile si modifie manuellement).")
     parser.add_argument("--skip-maps", action="store_true", help="Ne pas regenerer les cartes HTML.")
     args = parser.parse_args()
+    _lazy_imports()
 
     input_path = Path("London - mise \u00e0 jour.docx")
     output_dir = ensure_directory(Path(args.output_dir))
     map_dir = ensure_directory(output_dir / "maps") if not args.skip_maps else output_dir / "maps"
     output_doc = output_dir / "London_itinerary_optimise.docx"
 
-    days = parse_docx(input_path)
-    for day in days:
-        located = find_locations_in_text([day.title, *day.lines])
-        day.locations = clean_location_list(located)
-
-    merge_duplicate_locations(days)
-    add_missing_essentials(days)
+    days = load_days(input_path, output_dir / ".days_cache.pkl")
 
     for day in days:
         if "Oblix at The Shard" in day.locations and "The Shard" in day.locations:
             day.locations = [loc for loc in day.locations if loc != "The Shard"]
+            day.centroid = None
         if day.theme == "city":
             day.locations = [loc for loc in day.locations if loc != "Hyde Park"]
+            day.centroid = None
 
     day_segments: Dict[int, List[Segment]] = {}
     map_paths: Dict[int, Path] = {}
 
+    time_bounds = get_days_time_bounds(days)
     for day in days:
-        segments = build_day_schedule(day)
-        day_segments[day.index] = segments
-        if not args.skip_maps:
-            map_paths[day.index] = create_daily_map(day, segments, map_dir)
-
-    if not args.skip_document:
-        build_document(output_doc, days, day_segments, map_paths)
-
-    result_summary = {
-        "output_document": None if args.skip_document else str(output_doc),
-        "maps": {idx: str(path) for idx, path in map_paths.items()},
-        "changes": {
-            day.title: {
-                "removed_duplicates": day.removed_duplicates,
-                "added_essentials": day.added_essentials,
-                "locations": day.locations,
-            }
-            for day in days
-        },
-    }
-
-    with open(output_dir / "summary.json", "w", encoding="utf-8") as fh:
-        json.dump(result_summary, fh, ensure_ascii=False, indent=2)
-
-    print(json.dumps(result_summary, ensure_ascii=False, indent=2))
+        day_segments[day.index] = build_day_schedule(day, time_bounds[day.index])
+
+    if not args.skip_maps and days:
+        hashes_path = output_dir / ".map_hashes.json"
+        previous_maps = load_map_hashes(hashes_path)
+        recorded_maps: Dict[str, Dict[str, str]] = {}
+        reused: Dict[int, Path] = {}
+        pending: List[DaySection] = []
+        for day in days:
+            digest = map_input_hash(day, day_segments[day.index])
+            previous = previous_maps.get(str(day.index), {})
+            if previous.get("hash") == digest and Path(previous.get("path", "")).is_file():
+                reused[day.index] = Path(previous["path"])
+                recorded_maps[str(day.index)] = previous
+            else:
+                pending.append(day)
+                recorded_maps[str(day.index)] = {"hash": digest}
+
+        # Quelques cartes legeres : un pool de processus couterait plus cher que la generation.
+        generated = {day.index: create_daily_map(day, day_segments[day.index], map_dir) for day in pending}
+        for idx, path in generated.items():
+            recorded_maps[str(idx)]["path"] = str(path)
+
+        map_paths = {day.index: reused.get(day.index) or generated[day.index] for day in days}
+        with open(hashes_path, "w", encoding="utf-8") as fh:
+            json.dump(recorded_maps, fh, indent=2)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        document_future = None
+        if not args.skip_document:
+            # Chemins resolus une seule fois pour les liens du document.
+            resolved_map_paths = {idx: path.resolve() for idx, path in map_paths.items()}
+            document_future = executor.submit(build_document, output_doc, days, day_segments, resolved_map_paths)
+
+        # Le resume est encode pendant la construction du document...
+        result_summary = {
+            "output_document": None if args.skip_document else str(output_doc),
+            "maps": {idx: str(path) for idx, path in map_paths.items()},
+            "changes": {
+                day.title: {
+                    "removed_duplicates": day.removed_duplicates,
+                    "added_essentials": day.added_essentials,
+                    "locations": day.locations,
+                }
+                for day in days
+            },
+        }
+        payload = encode_summary(result_summary)
+
+        # ...mais n'est ecrit qu'une fois le document produit avec succes.
+        if document_future is not None:
+            document_future.result()
+    (output_dir / "summary.json").write_bytes(payload)
+    sys.stdout.buffer.write(payload + b"\n")
 
 
 if __name__ == "__main__":
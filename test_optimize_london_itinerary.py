@@ -0,0 +1,35 @@
+"""Tests des calculs de distance (forme atan2 de la formule de haversine)."""
+
+import math
+
+import numpy as np
+
+import optimize_london_itinerary as itinerary
+
+
+def test_oblix_shard_distance_is_exactly_zero():
+    assert itinerary.distance_between_pair("Oblix at The Shard", "The Shard") == 0.0
+    i = itinerary._NAME_TO_IDX["Oblix at The Shard"]
+    j = itinerary._NAME_TO_IDX["The Shard"]
+    assert itinerary._PAIR_DIST[i, j] == 0.0
+    assert itinerary._PAIR_DIST[j, i] == 0.0
+
+
+def test_pair_matrix_is_symmetric_with_zero_diagonal():
+    dist = itinerary._PAIR_DIST
+    assert not np.isnan(dist).any()
+    assert np.array_equal(dist, dist.T)
+    assert not np.diagonal(dist).any()
+
+
+def test_near_antipodal_points_give_no_nan():
+    # Pour ce couple, l'arrondi donne h = 1 + 2.2e-16 : sqrt(1 - h) serait NaN sans borne sur h.
+    lat = np.array([-1.4420742050052617, 0.0])
+    lon = np.array([1.5685530393021805, 0.0])
+    dist = itinerary.haversine_rad(lat, lon, -lat, lon + math.pi)
+    assert not np.isnan(dist).any()
+    np.testing.assert_allclose(dist, 6371.0 * math.pi)
+
+    matrix = itinerary.haversine_matrix(np.concatenate((lat, -lat)), np.concatenate((lon, lon + math.pi)))
+    assert not np.isnan(matrix).any()
+    np.testing.assert_allclose(matrix[[0, 1], [2, 3]], 6371.0 * math.pi)